@@ -1,26 +1,52 @@
 import os
 import pandas as pd
+import pyarrow.parquet as pq
 import streamlit as st
 import plotly.express as px
 
 st.set_page_config(page_title="Preventable Readmissions Dashboard", layout="wide")
 processed = st.sidebar.text_input("Processed data folder", "data/processed")
+if st.sidebar.button("Clear cache"):
+    st.cache_data.clear()
+
+def resolve(name):
+    for ext in ("parquet", "csv"):
+        path = os.path.join(processed, f"{name}.{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+def read_table(path):
+    if path.endswith(".parquet"):
+        return pq.read_table(path, memory_map=True).to_pandas()
+    return pd.read_csv(path, engine="pyarrow")
+
+# every widget interaction reruns the script; file mtimes are part of the cache key so a rebuild is picked up
+@st.cache_data
+def load_dashboard(paths, mtimes):
+    kpi = read_table(paths["kpi"]).iloc[0]
+    dx = read_table(paths["dx"])
+    risk = read_table(paths["risk"])
+    roi = read_table(paths["roi"])
+
+    top_dx = dx.sort_values("preventable_readmission_events", ascending=False).head(10)
+    tier = risk["risk_tier"].value_counts().reindex(["High","Medium","Low"]).fillna(0).reset_index()
+    tier.columns = ["risk_tier","members"]
+    roi_sorted = roi.sort_values("estimated_net_savings", ascending=False)
+    return kpi, top_dx, tier, roi_sorted
 
 paths = {
-    "kpi": os.path.join(processed, "kpi_summary.csv"),
-    "dx": os.path.join(processed, "diagnosis_summary.csv"),
-    "risk": os.path.join(processed, "patient_risk_scores.csv"),
-    "roi": os.path.join(processed, "intervention_roi.csv"),
+    "kpi": resolve("kpi_summary"),
+    "dx": resolve("diagnosis_summary"),
+    "risk": resolve("patient_risk_scores"),
+    "roi": resolve("intervention_roi"),
 }
 
-if not all(os.path.exists(p) for p in paths.values()):
+if not all(paths.values()):
     st.error("Processed files not found. Run: python src/build_analytics_tables.py")
     st.stop()
 
-kpi = pd.read_csv(paths["kpi"]).iloc[0]
-dx = pd.read_csv(paths["dx"])
-risk = pd.read_csv(paths["risk"])
-roi = pd.read_csv(paths["roi"])
+kpi, top_dx, tier, roi_sorted = load_dashboard(paths, tuple(os.path.getmtime(p) for p in paths.values()))
 
 st.title("Value-Based Care — Preventable Readmissions & Cost Leakage (Synthetic Data)")
 
@@ -31,14 +57,11 @@ c3.metric("30D Readmission Rate", f"{kpi.readmission_rate_30d*100:.2f}%")
 c4.metric("Preventable Readmission Spend", f"${kpi.preventable_readmission_paid:,.0f}")
 
 st.subheader("Top Diagnoses (Preventable Readmission Events)")
-top_dx = dx.sort_values("preventable_readmission_events", ascending=False).head(10)
 st.plotly_chart(px.bar(top_dx, x="primary_condition_group", y="preventable_readmission_events"), use_container_width=True)
 
 st.subheader("Risk Tier Distribution")
-tier = risk["risk_tier"].value_counts().reindex(["High","Medium","Low"]).fillna(0).reset_index()
-tier.columns = ["risk_tier","members"]
 st.plotly_chart(px.pie(tier, names="risk_tier", values="members", hole=0.45), use_container_width=True)
 
 st.subheader("Intervention ROI Simulation")
-st.plotly_chart(px.bar(roi.sort_values("estimated_net_savings", ascending=False), x="intervention", y="estimated_net_savings"), use_container_width=True)
-st.dataframe(roi.sort_values("estimated_net_savings", ascending=False), use_container_width=True)
+st.plotly_chart(px.bar(roi_sorted, x="intervention", y="estimated_net_savings"), use_container_width=True)
+st.dataframe(roi_sorted, use_container_width=True)
@@ -7,32 +7,112 @@ Inputs (data/raw):
 - admissions.csv
 - claims.csv
 
-Outputs (data/processed):
-- admissions_enriched.csv
-- readmissions_events.csv
-- diagnosis_summary.csv
-- hospital_summary.csv
-- kpi_summary.csv
-- patient_risk_scores.csv
-- intervention_roi.csv
+Outputs (data/processed, .parquet by default or .csv with --format csv):
+- admissions_enriched
+- readmissions_events
+- diagnosis_summary
+- hospital_summary
+- kpi_summary
+- patient_risk_scores
+- intervention_roi
 """
 import argparse
+import functools
 import os
+import shutil
 import numpy as np
 import pandas as pd
 
+RISK_TIERS = ["Low","Medium","High"]
+RISK_TIER_CUTS = [33, 66]
+# loading the numba kernel costs ~0.2-1 s, which the fused loop only wins back at about a million members
+RISK_JIT_MIN_ROWS = 1_000_000
+
+# low-cardinality strings load as categoricals and small bounded integers as int8/int16;
+# paid amounts stay float64 so cent totals are exact
+MEMBER_DTYPES = {"age": "int16", "chronic_count": "int8", "sex": "category", "state": "category", "plan_type": "category"}
+ADMISSION_DTYPES = {
+    "primary_condition_group": "category",
+    "length_of_stay": "int16", "drg": "int16", "preventable_proxy": "int8", "followup_within_7d": "int8",
+}
+# cpt stays a plain string: it only feeds the ED isin, and as a category the all-NaN inpatient
+# parser blocks get categories of a different dtype that cannot be unioned with the rest
+CLAIM_DTYPES = {"claim_type": "category", "cpt": str}
+CLAIM_FEATURE_COLS = ["member_id","claim_date","claim_type","cpt"]
+ED_CPT_CODES = ["A0427","99214"]
+
+def clear_path(path: str) -> None:
+    # the dask engine writes parquet as a directory of parts and the others as one file;
+    # clear whichever is there so every engine can write into the same out_dir
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+def write_table(df: pd.DataFrame, out_dir: str, name: str, fmt: str) -> None:
+    path = os.path.join(out_dir, f"{name}.{fmt}")
+    clear_path(path)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False, compression="zstd")
+    else:
+        df.to_csv(path, index=False)
+
+def materialize(*values) -> tuple:
+    """Evaluate lazy dask values in one pass; pandas values pass through unchanged."""
+    if any(hasattr(v, "dask") for v in values):
+        import dask
+        return dask.compute(*values)
+    return values
+
+def write_csv_part(df: pd.DataFrame, parts_dir: str, partition_info=None) -> pd.DataFrame:
+    n = partition_info["number"]
+    df.to_csv(os.path.join(parts_dir, f"part-{n:05d}.csv"), index=False, header=n == 0)
+    return pd.DataFrame({"rows": [len(df)]})
+
+def write_table_dask(ddf, out_dir: str, name: str, fmt: str):
+    """Lazy write of a dask frame; materialize it with the other outputs, then call join_csv_parts."""
+    path = os.path.join(out_dir, f"{name}.{fmt}")
+    clear_path(path)
+    if fmt == "parquet":
+        # a directory of part files; pd.read_parquet reads it like a single file
+        return ddf.to_parquet(path, write_index=False, compression="zstd", compute=False)
+    # dd.to_csv builds its own graph that would re-run the whole pipeline, so write one part per
+    # partition inside the shared graph and concatenate them afterwards
+    parts_dir = path + ".parts"
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    os.makedirs(parts_dir)
+    return ddf.map_partitions(write_csv_part, parts_dir, meta={"rows": "int64"})
+
+def join_csv_parts(out_dir: str, name: str) -> None:
+    path = os.path.join(out_dir, f"{name}.csv")
+    parts_dir = path + ".parts"
+    with open(path, "wb") as out:
+        for part in sorted(os.listdir(parts_dir)):
+            with open(os.path.join(parts_dir, part), "rb") as f:
+                shutil.copyfileobj(f, out)
+    shutil.rmtree(parts_dir)
+
 def compute_readmission_flags(adm: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
-    adm = adm.copy()
+    adm = flag_next_admissions(adm)
+    return adm, readmission_events(adm)
+
+def flag_next_admissions(adm: pd.DataFrame) -> pd.DataFrame:
+    # sort_values already returns a new frame, so the caller's admissions are never mutated
+    adm = adm.sort_values(["member_id","admit_date","admission_id"]).reset_index(drop=True)
     adm["admit_date"] = pd.to_datetime(adm["admit_date"])
     adm["discharge_date"] = pd.to_datetime(adm["discharge_date"])
-    adm = adm.sort_values(["member_id","admit_date"]).reset_index(drop=True)
 
-    g = adm.groupby("member_id", sort=False)
-    adm["next_admit_date"] = g["admit_date"].shift(-1)
-    adm["next_admission_id"] = g["admission_id"].shift(-1)
+    # rows are sorted by member, so the next row is the next admission whenever it has the same member_id
+    mid = adm["member_id"].to_numpy()
+    same_member = np.zeros(len(adm), dtype=bool)
+    same_member[:-1] = mid[1:] == mid[:-1]
+    adm["next_admit_date"] = adm["admit_date"].shift(-1).where(same_member)
+    adm["next_admission_id"] = adm["admission_id"].shift(-1).where(same_member)
     adm["days_to_next_admit"] = (adm["next_admit_date"] - adm["discharge_date"]).dt.days
-    adm["is_30d_readmission"] = ((adm["days_to_next_admit"] >= 1) & (adm["days_to_next_admit"] <= 30)).astype(int)
+    adm["is_30d_readmission"] = ((adm["days_to_next_admit"] >= 1) & (adm["days_to_next_admit"] <= 30)).astype(np.int8)
+    return adm
 
+def readmission_events(adm: pd.DataFrame) -> pd.DataFrame:
     events = adm.loc[adm["is_30d_readmission"]==1, [
         "member_id","admission_id","discharge_date","next_admission_id","next_admit_date","days_to_next_admit",
         "primary_condition_group","hospital_id","inpatient_paid_amount","preventable_proxy","followup_within_7d"
@@ -55,48 +135,227 @@ def compute_readmission_flags(adm: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataF
     })
     events = events.merge(readm, on="next_admission_id", how="left")
     events["readmission_event_total_paid"] = events["index_inpatient_paid_amount"] + events["readmit_inpatient_paid_amount"]
-    return adm, events
+    return events
 
-def build_util_features(members: pd.DataFrame, admissions: pd.DataFrame, claims: pd.DataFrame, as_of: pd.Timestamp) -> pd.DataFrame:
-    admissions = admissions.copy()
-    claims = claims.copy()
-    admissions["admit_date"] = pd.to_datetime(admissions["admit_date"])
-    claims["claim_date"] = pd.to_datetime(claims["claim_date"])
+def compute_readmission_flags_dask(admissions_path: str, blocksize: str = "128MB"):
+    """Out-of-core compute_readmission_flags (--engine dask); returns lazy dask frames."""
+    import dask.dataframe as dd
+
+    adm = dd.read_csv(admissions_path, blocksize=blocksize, dtype=ADMISSION_DTYPES, parse_dates=["admit_date","discharge_date"])
+    # the next-admission lookup needs all of a member's admissions in one partition;
+    # meta comes from running each step on the empty schema frame
+    adm = adm.shuffle(on="member_id")
+    adm = adm.map_partitions(flag_next_admissions, meta=flag_next_admissions(adm._meta))
+    return adm, adm.map_partitions(readmission_events, meta=readmission_events(adm._meta))
+
+def build_util_features(members: pd.DataFrame, admissions: pd.DataFrame, claims_path: str, as_of: pd.Timestamp, chunksize: int = 1_000_000) -> pd.DataFrame:
+    admit_date = pd.to_datetime(admissions["admit_date"])
     start = as_of - pd.Timedelta(days=365)
 
-    adm_12m = admissions[(admissions["admit_date"] >= start) & (admissions["admit_date"] <= as_of)]
-    clm_12m = claims[(claims["claim_date"] >= start) & (claims["claim_date"] <= as_of)]
+    adm_12m = admissions[(admit_date >= start) & (admit_date <= as_of)]
+
+    # claims is the largest input, so count it chunk by chunk and sum the partial counts per member
+    ed_parts, outpatient_parts = [], []
+    for chunk in pd.read_csv(claims_path, usecols=CLAIM_FEATURE_COLS, dtype=CLAIM_DTYPES, parse_dates=["claim_date"], chunksize=chunksize):
+        clm_12m = chunk[(chunk["claim_date"] >= start) & (chunk["claim_date"] <= as_of)]
+        is_ed = clm_12m["cpt"].isin(ED_CPT_CODES)
+        ed_parts.append(clm_12m[is_ed].groupby("member_id").size())
+        outpatient_parts.append(clm_12m[clm_12m["claim_type"]=="OUTPATIENT"].groupby("member_id").size())
 
     prior_adm = adm_12m.groupby("member_id").size().rename("prior_admissions_12m")
-    ed_visits = clm_12m[clm_12m["cpt"].isin(["A0427","99214"])].groupby("member_id").size().rename("ed_visits_12m")
-    outpatient = clm_12m[clm_12m["claim_type"]=="OUTPATIENT"].groupby("member_id").size().rename("outpatient_visits_12m")
-    no_follow = adm_12m.groupby("member_id")["followup_within_7d"].apply(lambda s: float((1-s).mean()) if len(s) else 0).rename("no_followup_rate")
+    ed_visits = pd.concat(ed_parts).groupby(level=0).sum().rename("ed_visits_12m")
+    outpatient = pd.concat(outpatient_parts).groupby(level=0).sum().rename("outpatient_visits_12m")
+    no_follow = (1 - adm_12m.groupby("member_id")["followup_within_7d"].mean()).rename("no_followup_rate")
 
     feats = pd.concat([prior_adm, ed_visits, outpatient, no_follow], axis=1).reset_index().fillna(0)
     return feats
 
+DX_AGGS = {
+    "admissions": ("admission_id","count"),
+    "readmissions_30d": ("is_30d_readmission","sum"),
+    "avg_inpatient_paid": ("inpatient_paid_amount","mean"),
+    "preventable_readmission_events": ("is_preventable_readmission_event","sum"),
+    "total_readmission_events": ("is_preventable_readmission_event","count"),
+    "avoidable_paid": ("event_readmit_paid","sum"),
+}
+HOSP_AGGS = {
+    "admissions": ("admission_id","count"),
+    "readmissions_30d": ("is_30d_readmission","sum"),
+    "avg_paid": ("inpatient_paid_amount","mean"),
+}
+
+def attach_readmission_events(admissions_enriched: pd.DataFrame, readm_events: pd.DataFrame) -> pd.DataFrame:
+    # every event hangs off its index admission, so the dx summary can aggregate events and admissions in one pass
+    events = pd.DataFrame({
+        "admission_id": readm_events["index_admission_id"],
+        "is_preventable_readmission_event": ((readm_events["index_preventable_proxy"]==1) & (readm_events["days_to_next_admit"].between(1,30))).astype(int),
+        "event_readmit_paid": readm_events["readmit_inpatient_paid_amount"],
+    })
+    return admissions_enriched[["admission_id","primary_condition_group","is_30d_readmission","inpatient_paid_amount"]].merge(events, on="admission_id", how="left")
+
+def finish_dx_summary(dx: pd.DataFrame) -> pd.DataFrame:
+    # groupby-sum keeps int8 when the result fits, so cast counts to keep the schema engine- and size-independent
+    dx = dx.reset_index().astype({c: "int64" for c in ["admissions","readmissions_30d","preventable_readmission_events","total_readmission_events"]})
+    dx.insert(4, "readmission_rate_30d", (dx["readmissions_30d"] / dx["admissions"]).replace([np.inf,np.nan],0))
+    dx["preventable_share_of_readmissions"] = (dx["preventable_readmission_events"] / dx["total_readmission_events"]).replace([np.inf,np.nan],0)
+    return dx.sort_values(["preventable_readmission_events","readmissions_30d"], ascending=False)
+
+def finish_hosp_summary(hosp: pd.DataFrame) -> pd.DataFrame:
+    hosp = hosp.reset_index().astype({"admissions": "int64", "readmissions_30d": "int64"})
+    hosp["readmission_rate_30d"] = (hosp["readmissions_30d"]/hosp["admissions"]).replace([np.inf,np.nan],0)
+    return hosp.sort_values(["readmission_rate_30d","hospital_id"], ascending=[False, True])
+
+def build_summaries(admissions_enriched: pd.DataFrame, readm_events: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    dx = attach_readmission_events(admissions_enriched, readm_events).groupby("primary_condition_group", observed=True).agg(**DX_AGGS)
+    hosp = admissions_enriched.groupby("hospital_id").agg(**HOSP_AGGS)
+    return finish_dx_summary(dx), finish_hosp_summary(hosp)
+
+def build_summaries_dask(admissions_enriched, readm_events) -> tuple:
+    """Lazy dx/hosp aggregates; materialize them with the other outputs, then finish_*_summary."""
+    import dask.dataframe as dd
+
+    # events are derived partition by partition, so partitions line up one to one with admissions
+    meta = attach_readmission_events(admissions_enriched._meta, readm_events._meta)
+    dx_in = dd.map_partitions(attach_readmission_events, admissions_enriched, readm_events, meta=meta, align_dataframes=False)
+    dx = dx_in.groupby("primary_condition_group", observed=True).agg(**DX_AGGS)
+    hosp = admissions_enriched.groupby("hospital_id").agg(**HOSP_AGGS)
+    return dx, hosp
+
+def build_summaries_polars(admissions_path: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Polars lazy equivalent of compute_readmission_flags + build_summaries (--engine polars)."""
+    import polars as pl
+
+    def safe_div(num: str, den: str) -> pl.Expr:
+        return pl.when(pl.col(den) > 0).then(pl.col(num) / pl.col(den)).otherwise(0.0)
+
+    adm = (
+        pl.scan_csv(admissions_path, schema_overrides={
+            "admit_date": pl.Date, "discharge_date": pl.Date, "primary_condition_group": pl.Categorical,
+            "length_of_stay": pl.Int16, "drg": pl.Int16, "preventable_proxy": pl.Int8, "followup_within_7d": pl.Int8,
+        })
+        .sort(["member_id","admit_date","admission_id"])
+        .with_columns(
+            next_admit_date=pl.col("admit_date").shift(-1).over("member_id"),
+            next_admission_id=pl.col("admission_id").shift(-1).over("member_id"),
+        )
+        .with_columns(days_to_next_admit=(pl.col("next_admit_date") - pl.col("discharge_date")).dt.total_days())
+        .with_columns(is_30d_readmission=pl.col("days_to_next_admit").is_between(1, 30).fill_null(False).cast(pl.Int8))
+    )
+
+    readm = adm.select(
+        next_admission_id=pl.col("admission_id"),
+        readmit_admit_date=pl.col("admit_date"),
+        readmit_condition_group=pl.col("primary_condition_group"),
+        readmit_preventable_proxy=pl.col("preventable_proxy"),
+        readmit_inpatient_paid_amount=pl.col("inpatient_paid_amount"),
+    )
+    events = (
+        adm.filter(pl.col("is_30d_readmission") == 1)
+        .select(
+            "member_id",
+            index_admission_id=pl.col("admission_id"),
+            index_discharge_date=pl.col("discharge_date"),
+            next_admission_id=pl.col("next_admission_id"),
+            next_admit_date=pl.col("next_admit_date"),
+            days_to_next_admit=pl.col("days_to_next_admit"),
+            index_condition_group=pl.col("primary_condition_group"),
+            index_hospital_id=pl.col("hospital_id"),
+            index_inpatient_paid_amount=pl.col("inpatient_paid_amount"),
+            index_preventable_proxy=pl.col("preventable_proxy"),
+            index_followup_within_7d=pl.col("followup_within_7d"),
+        )
+        .join(readm, on="next_admission_id", how="left")
+        .with_columns(readmission_event_total_paid=pl.col("index_inpatient_paid_amount") + pl.col("readmit_inpatient_paid_amount"))
+    )
+
+    event_cols = events.select(
+        admission_id=pl.col("index_admission_id"),
+        is_preventable_readmission_event=((pl.col("index_preventable_proxy") == 1) & pl.col("days_to_next_admit").is_between(1, 30)).cast(pl.Int64),
+        event_readmit_paid=pl.col("readmit_inpatient_paid_amount"),
+    )
+    dx = (
+        adm.join(event_cols, on="admission_id", how="left")
+        .group_by("primary_condition_group")
+        .agg(
+            admissions=pl.col("admission_id").count().cast(pl.Int64),
+            readmissions_30d=pl.col("is_30d_readmission").sum().cast(pl.Int64),
+            avg_inpatient_paid=pl.col("inpatient_paid_amount").mean(),
+            preventable_readmission_events=pl.col("is_preventable_readmission_event").sum(),
+            total_readmission_events=pl.col("is_preventable_readmission_event").count().cast(pl.Int64),
+            avoidable_paid=pl.col("event_readmit_paid").sum(),
+        )
+        .with_columns(
+            readmission_rate_30d=safe_div("readmissions_30d", "admissions"),
+            preventable_share_of_readmissions=safe_div("preventable_readmission_events", "total_readmission_events"),
+        )
+        .select(
+            "primary_condition_group","admissions","readmissions_30d","avg_inpatient_paid","readmission_rate_30d",
+            "preventable_readmission_events","total_readmission_events","avoidable_paid","preventable_share_of_readmissions",
+        )
+        .sort(["preventable_readmission_events","readmissions_30d"], descending=True)
+    )
+    hosp = (
+        adm.group_by("hospital_id")
+        .agg(
+            admissions=pl.col("admission_id").count().cast(pl.Int64),
+            readmissions_30d=pl.col("is_30d_readmission").sum().cast(pl.Int64),
+            avg_paid=pl.col("inpatient_paid_amount").mean(),
+        )
+        .with_columns(readmission_rate_30d=safe_div("readmissions_30d", "admissions"))
+        .sort(["readmission_rate_30d","hospital_id"], descending=[True, False])
+    )
+
+    frames = pl.collect_all([adm, events, dx, hosp])
+    return tuple(f.to_pandas() for f in frames)
+
+def _risk_raw(age, chronic, sdi, prior_adm, prior_ed, outpt, no_follow):
+    return (
+        0.22*(np.clip(age, 18, 90)-18)/72
+        + 0.22*(np.clip(chronic, 0, 6)/6)
+        + 0.20*np.clip(sdi, 0, 1)
+        + 0.16*(np.clip(prior_adm, 0, 10)/10)
+        + 0.10*(np.clip(prior_ed, 0, 20)/20)
+        + 0.05*(np.clip(outpt, 0, 60)/60)
+        + 0.05*np.clip(no_follow, 0, 1)
+    )
+
+@functools.cache
+def _risk_raw_jit():
+    """Numba-compiled _risk_raw, or None when numba is not installed."""
+    try:
+        from numba import njit, prange
+    except ImportError:  # numba is optional; score_risk falls back to plain NumPy
+        return None
+
+    @njit(parallel=True, cache=True)
+    def risk_raw(age, chronic, sdi, prior_adm, prior_ed, outpt, no_follow):
+        # same weighted sum as _risk_raw, fused into one pass without temporaries
+        raw = np.empty(age.shape[0])
+        for i in prange(age.shape[0]):
+            raw[i] = (
+                0.22*(min(max(age[i], 18.0), 90.0)-18)/72
+                + 0.22*(min(max(chronic[i], 0.0), 6.0)/6)
+                + 0.20*min(max(sdi[i], 0.0), 1.0)
+                + 0.16*(min(max(prior_adm[i], 0.0), 10.0)/10)
+                + 0.10*(min(max(prior_ed[i], 0.0), 20.0)/20)
+                + 0.05*(min(max(outpt[i], 0.0), 60.0)/60)
+                + 0.05*min(max(no_follow[i], 0.0), 1.0)
+            )
+        return raw
+    return risk_raw
+
 def score_risk(members: pd.DataFrame, feats: pd.DataFrame) -> pd.DataFrame:
     df = members.merge(feats, on="member_id", how="left").fillna(0)
-    age = df["age"].clip(18, 90)
-    chronic = df["chronic_count"].clip(0, 6)
-    sdi = df["sdi"].clip(0, 1)
-    prior_adm = df["prior_admissions_12m"].clip(0, 10)
-    prior_ed = df["ed_visits_12m"].clip(0, 20)
-    outpt = df["outpatient_visits_12m"].clip(0, 60)
-    no_follow = df["no_followup_rate"].clip(0, 1)
-
-    raw = (
-        0.22*(age-18)/72
-        + 0.22*(chronic/6)
-        + 0.20*sdi
-        + 0.16*(prior_adm/10)
-        + 0.10*(prior_ed/20)
-        + 0.05*(outpt/60)
-        + 0.05*no_follow
-    )
-    score = (raw / raw.max()) * 100
-    df["readmission_risk_score"] = score.round(1)
-    df["risk_tier"] = pd.cut(df["readmission_risk_score"], bins=[-1, 33, 66, 101], labels=["Low","Medium","High"])
+    cols = ["age","chronic_count","sdi","prior_admissions_12m","ed_visits_12m","outpatient_visits_12m","no_followup_rate"]
+    arrays = [df[c].to_numpy(dtype=np.float64) for c in cols]
+    kernel = _risk_raw_jit() if len(df) >= RISK_JIT_MIN_ROWS else None
+    raw = kernel(*arrays) if kernel is not None else _risk_raw(*arrays)
+
+    score = np.round((raw / raw.max()) * 100, 1)
+    df["readmission_risk_score"] = score
+    # side="left" keeps the old right-closed bins: 33.0 is Low, 66.0 is Medium
+    tier_code = np.searchsorted(RISK_TIER_CUTS, score, side="left")
+    df["risk_tier"] = pd.Categorical.from_codes(tier_code, categories=RISK_TIERS, ordered=True)
     return df[[
         "member_id","age","sex","state","plan_type","sdi","chronic_count",
         "prior_admissions_12m","ed_visits_12m","outpatient_visits_12m","no_followup_rate",
@@ -108,57 +367,64 @@ def main():
     ap.add_argument("--raw_dir", type=str, default="data/raw")
     ap.add_argument("--out_dir", type=str, default="data/processed")
     ap.add_argument("--as_of_date", type=str, default=None)
+    ap.add_argument("--format", type=str, choices=["parquet","csv"], default="parquet")
+    ap.add_argument("--engine", type=str, choices=["pandas","polars","dask"], default="pandas")
     args = ap.parse_args()
 
     os.makedirs(args.out_dir, exist_ok=True)
 
-    members = pd.read_csv(os.path.join(args.raw_dir, "members.csv"))
-    admissions = pd.read_csv(os.path.join(args.raw_dir, "admissions.csv"))
-    claims = pd.read_csv(os.path.join(args.raw_dir, "claims.csv"))
+    members = pd.read_csv(os.path.join(args.raw_dir, "members.csv"), engine="pyarrow", dtype=MEMBER_DTYPES)
 
-    admissions_enriched, readm_events = compute_readmission_flags(admissions)
+    if args.engine == "polars":
+        admissions_enriched, readm_events, dx, hosp = build_summaries_polars(os.path.join(args.raw_dir, "admissions.csv"))
+    elif args.engine == "dask":
+        admissions_enriched, readm_events = compute_readmission_flags_dask(os.path.join(args.raw_dir, "admissions.csv"))
+        dx, hosp = build_summaries_dask(admissions_enriched, readm_events)
+    else:
+        admissions = pd.read_csv(os.path.join(args.raw_dir, "admissions.csv"), engine="pyarrow", dtype=ADMISSION_DTYPES)
+        admissions_enriched, readm_events = compute_readmission_flags(admissions)
+        dx, hosp = build_summaries(admissions_enriched, readm_events)
 
-    admissions_enriched["admit_date"] = pd.to_datetime(admissions_enriched["admit_date"])
-    as_of = pd.to_datetime(args.as_of_date) if args.as_of_date else admissions_enriched["admit_date"].max()
+    # with dask everything read from the admissions graph is evaluated in this one call, so read_csv,
+    # the shuffle and the readmission flags run once; the other engines pass through unchanged
+    is_preventable = (readm_events["index_preventable_proxy"]==1) & (readm_events["days_to_next_admit"].between(1,30))
+    dask_writes = []
+    if args.engine == "dask":
+        dask_writes = [
+            write_table_dask(admissions_enriched, args.out_dir, "admissions_enriched", args.format),
+            write_table_dask(readm_events, args.out_dir, "readmissions_events", args.format),
+        ]
+    (max_admit_date, feat_cols, dx, hosp,
+     total_adm, total_readm, total_inpatient_paid, preventable_readm_paid, n_events, avg_readm_paid, *_) = materialize(
+        admissions_enriched["admit_date"].max(),
+        admissions_enriched[["member_id","admit_date","followup_within_7d"]],
+        dx,
+        hosp,
+        admissions_enriched["admission_id"].count(),
+        admissions_enriched["is_30d_readmission"].sum(),
+        admissions_enriched["inpatient_paid_amount"].sum(),
+        readm_events.loc[is_preventable, "readmit_inpatient_paid_amount"].sum(),
+        readm_events["index_admission_id"].count(),
+        readm_events["readmit_inpatient_paid_amount"].mean(),
+        *dask_writes,
+    )
+    if args.engine == "dask":
+        dx, hosp = finish_dx_summary(dx), finish_hosp_summary(hosp)
+        if args.format == "csv":
+            join_csv_parts(args.out_dir, "admissions_enriched")
+            join_csv_parts(args.out_dir, "readmissions_events")
 
-    feats = build_util_features(members, admissions_enriched, claims, as_of)
+    as_of = pd.to_datetime(args.as_of_date) if args.as_of_date else max_admit_date
+    feats = build_util_features(members, feat_cols, os.path.join(args.raw_dir, "claims.csv"), as_of)
     risk = score_risk(members, feats)
 
-    # Dx summary
-    dx = admissions_enriched.groupby("primary_condition_group").agg(
-        admissions=("admission_id","count"),
-        readmissions_30d=("is_30d_readmission","sum"),
-        avg_inpatient_paid=("inpatient_paid_amount","mean"),
-    ).reset_index()
-    dx["readmission_rate_30d"] = (dx["readmissions_30d"] / dx["admissions"]).replace([np.inf,np.nan],0)
-
-    preventable_events = readm_events.copy()
-    preventable_events["is_preventable_readmission_event"] = ((preventable_events["index_preventable_proxy"]==1) & (preventable_events["days_to_next_admit"].between(1,30))).astype(int)
-    prev_by_dx = preventable_events.groupby("index_condition_group").agg(
-        preventable_readmission_events=("is_preventable_readmission_event","sum"),
-        total_readmission_events=("index_admission_id","count"),
-        avoidable_paid=("readmit_inpatient_paid_amount", "sum"),
-    ).reset_index().rename(columns={"index_condition_group":"primary_condition_group"})
-    dx = dx.merge(prev_by_dx, on="primary_condition_group", how="left").fillna(0)
-    dx["preventable_share_of_readmissions"] = (dx["preventable_readmission_events"] / dx["total_readmission_events"]).replace([np.inf,np.nan],0)
-    dx = dx.sort_values(["preventable_readmission_events","readmissions_30d"], ascending=False)
-
-    # Hospital summary
-    hosp = admissions_enriched.groupby("hospital_id").agg(
-        admissions=("admission_id","count"),
-        readmissions_30d=("is_30d_readmission","sum"),
-        avg_paid=("inpatient_paid_amount","mean"),
-    ).reset_index()
-    hosp["readmission_rate_30d"] = (hosp["readmissions_30d"]/hosp["admissions"]).replace([np.inf,np.nan],0)
-    hosp = hosp.sort_values("readmission_rate_30d", ascending=False)
-
     # KPIs
-    total_adm = int(len(admissions_enriched))
-    total_readm = int(admissions_enriched["is_30d_readmission"].sum())
+    total_adm = int(total_adm)
+    total_readm = int(total_readm)
     readm_rate = total_readm/total_adm if total_adm else 0
-    total_inpatient_paid = float(admissions_enriched["inpatient_paid_amount"].sum())
-    preventable_readm_paid = float(preventable_events.loc[preventable_events["is_preventable_readmission_event"]==1, "readmit_inpatient_paid_amount"].sum())
-    avg_readm_paid = float(preventable_events["readmit_inpatient_paid_amount"].mean()) if len(preventable_events) else 0
+    total_inpatient_paid = float(total_inpatient_paid)
+    preventable_readm_paid = float(preventable_readm_paid)
+    avg_readm_paid = float(avg_readm_paid) if n_events else 0
     high_risk_members = int((risk["risk_tier"]=="High").sum())
 
     kpi = pd.DataFrame([{
@@ -197,13 +463,14 @@ def main():
     roi_df = pd.DataFrame(roi_rows).sort_values("estimated_net_savings", ascending=False)
 
     # Save
-    admissions_enriched.to_csv(os.path.join(args.out_dir, "admissions_enriched.csv"), index=False)
-    readm_events.to_csv(os.path.join(args.out_dir, "readmissions_events.csv"), index=False)
-    dx.to_csv(os.path.join(args.out_dir, "diagnosis_summary.csv"), index=False)
-    hosp.to_csv(os.path.join(args.out_dir, "hospital_summary.csv"), index=False)
-    risk.to_csv(os.path.join(args.out_dir, "patient_risk_scores.csv"), index=False)
-    roi_df.to_csv(os.path.join(args.out_dir, "intervention_roi.csv"), index=False)
-    kpi.to_csv(os.path.join(args.out_dir, "kpi_summary.csv"), index=False)
+    if args.engine != "dask":
+        write_table(admissions_enriched, args.out_dir, "admissions_enriched", args.format)
+        write_table(readm_events, args.out_dir, "readmissions_events", args.format)
+    write_table(dx, args.out_dir, "diagnosis_summary", args.format)
+    write_table(hosp, args.out_dir, "hospital_summary", args.format)
+    write_table(risk, args.out_dir, "patient_risk_scores", args.format)
+    write_table(roi_df, args.out_dir, "intervention_roi", args.format)
+    write_table(kpi, args.out_dir, "kpi_summary", args.format)
 
     print("Wrote processed tables to:", args.out_dir)
     print(kpi.to_string(index=False))
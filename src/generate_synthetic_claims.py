@@ -27,201 +27,221 @@ CONDITIONS = [
 CPT_OUTPATIENT = ["99213","99214","93000","36415","83036","80053","71045","A0427","G0439"]
 PROVIDERS = [f"P{str(i).zfill(5)}" for i in range(1, 801)]
 HOSPITALS = [f"H{str(i).zfill(4)}" for i in range(1, 121)]
+CLAIM_TYPES = ["OUTPATIENT","INPATIENT"]
+# shard size is fixed, not tied to --n_jobs or the core count, so a seed always gives the same data
+MEMBERS_PER_SHARD = 25_000
+
+# per-condition lookup tables, indexed by position in CONDITIONS
+COND_NAMES = np.array([c[0] for c in CONDITIONS])
+COND_DRG = np.array([c[2] for c in CONDITIONS], dtype=np.int16)
+COND_WEIGHTS = np.array([1.2,1.1,1.1,0.9,0.7,0.8,0.6], dtype=float)
+ICD_COUNT = np.array([len(c[1]) for c in CONDITIONS])
+ICD_TABLE = np.array([c[1] + [c[1][0]]*(ICD_COUNT.max()-len(c[1])) for c in CONDITIONS])
+PREVENTABLE_BASE = np.array([0.55,0.50,0.35,0.40,0.20,0.25,0.18])
+COND_COST_MULT = np.array([1.10,1.00,0.85,0.95,1.55,1.25,0.80])
+READMIT_COST_MULT = np.array([1.05,1.00,0.85,0.95,1.60,1.20,0.80])
 
 def sigmoid(x: np.ndarray) -> np.ndarray:
     return 1/(1+np.exp(-x))
 
+def format_ids(prefix: str, start_id: int, n: int, width: int) -> np.ndarray:
+    return np.char.add(prefix, np.char.zfill(np.arange(start_id, start_id+n).astype(str), width))
+
 def make_members(rng: np.random.Generator, n: int) -> pd.DataFrame:
-    member_id = [f"M{str(i).zfill(7)}" for i in range(1, n+1)]
-    age = rng.integers(18, 91, size=n)
+    member_id = format_ids("M", 1, n, 7)
+    age = rng.integers(18, 91, size=n).astype(np.int16)
     sex = rng.choice(["F","M"], size=n, p=[0.52, 0.48])
     state = rng.choice(["TX","CA","FL","NY","GA","NC","IL","AZ","WA","NJ"], size=n)
     sdi = np.clip(rng.normal(0.45, 0.22, size=n), 0, 1)
     plan_type = rng.choice(["HMO","PPO","Medicare Advantage"], size=n, p=[0.35,0.45,0.20])
     chronic_lambda = 0.8 + 0.03*np.clip(age-45, 0, None) + 0.9*sdi
-    chronic_count = np.clip(rng.poisson(chronic_lambda), 0, 6)
+    chronic_count = np.clip(rng.poisson(chronic_lambda), 0, 6).astype(np.int8)
     return pd.DataFrame({
         "member_id": member_id,
         "age": age,
-        "sex": sex,
-        "state": state,
+        "sex": pd.Categorical(sex),
+        "state": pd.Categorical(state),
         "sdi": np.round(sdi,3),
-        "plan_type": plan_type,
+        "plan_type": pd.Categorical(plan_type),
         "chronic_count": chronic_count,
     })
 
 def random_date(rng: np.random.Generator, start: datetime, end: datetime, size: int) -> np.ndarray:
     delta = (end - start).days
     days = rng.integers(0, delta+1, size=size)
-    return np.array([start + timedelta(days=int(d)) for d in days], dtype="datetime64[ns]")
+    return (np.datetime64(start.date(), "D") + days.astype("timedelta64[D]")).astype("datetime64[ns]")
 
 def make_admissions(rng: np.random.Generator, members: pd.DataFrame, start: datetime, end: datetime) -> pd.DataFrame:
-    n = len(members)
-    base = 0.12 + 0.01*(members["age"]>65).astype(float) + 0.03*members["chronic_count"].clip(0,6)
-    adm_count = rng.poisson(base.to_numpy()*3)
+    age = members["age"].to_numpy()
+    sdi = members["sdi"].to_numpy()
+    chronic = members["chronic_count"].to_numpy()
+    base = 0.12 + 0.01*(age>65) + 0.03*np.clip(chronic, 0, 6)
+    adm_count = rng.poisson(base*3)
     adm_count = np.clip(adm_count, 0, 6)
 
-    rows = []
-    adm_id = 1
-    for i, m in members.iterrows():
-        k = int(adm_count[i])
-        if k == 0:
-            continue
-        admit_dates = np.sort(random_date(rng, start, end - timedelta(days=5), k))
-        for ad in admit_dates:
-            weights = np.array([1.2,1.1,1.1,0.9,0.7,0.8,0.6], dtype=float)
-            weights = weights * (1 + 0.06*m["chronic_count"] + 0.008*max(m["age"]-50,0))
-            weights = weights / weights.sum()
-            cond_idx = rng.choice(len(CONDITIONS), p=weights)
-            cond, icd_list, drg = CONDITIONS[cond_idx]
-            icd10 = rng.choice(icd_list)
-            los = int(np.clip(rng.normal(4.2, 2.0), 1, 18))
-            discharge = (pd.Timestamp(ad) + pd.Timedelta(days=los)).to_datetime64()
-            hospital_id = rng.choice(HOSPITALS)
-            attending_provider_id = rng.choice(PROVIDERS)
-
-            preventable_base = {"CHF":0.55,"COPD":0.50,"DIABETES":0.35,"PNEUMONIA":0.40,"SEPSIS":0.20,"CKD":0.25,"HTN":0.18}[cond]
-            preventable = rng.random() < np.clip(preventable_base + 0.25*m["sdi"] + 0.06*m["chronic_count"], 0, 0.95)
-
-            cond_mult = {"CHF":1.10,"COPD":1.00,"DIABETES":0.85,"PNEUMONIA":0.95,"SEPSIS":1.55,"CKD":1.25,"HTN":0.80}[cond]
-            base_cost = rng.lognormal(mean=8.7, sigma=0.35)
-            paid = base_cost * cond_mult * (1 + 0.10*(los-4))
-            paid = float(np.clip(paid, 1800, 90000))
-
-            followup_7d = rng.random() < np.clip(0.62 - 0.20*m["sdi"] - 0.06*m["chronic_count"], 0.05, 0.90)
-
-            rows.append({
-                "admission_id": f"A{adm_id:09d}",
-                "member_id": m["member_id"],
-                "hospital_id": hospital_id,
-                "attending_provider_id": attending_provider_id,
-                "admit_date": pd.Timestamp(ad).date().isoformat(),
-                "discharge_date": pd.Timestamp(discharge).date().isoformat(),
-                "length_of_stay": los,
-                "primary_condition_group": cond,
-                "primary_icd10": icd10,
-                "drg": drg,
-                "preventable_proxy": int(preventable),
-                "followup_within_7d": int(followup_7d),
-                "inpatient_paid_amount": round(paid,2),
-            })
-            adm_id += 1
-
-    admissions = pd.DataFrame(rows)
-    if admissions.empty:
-        return admissions
+    n_adm = int(adm_count.sum())
+    if n_adm == 0:
+        return pd.DataFrame()
+
+    # one row per admission, grouped by member with admit dates sorted inside each member
+    member_idx = np.repeat(np.arange(len(members)), adm_count)
+    admit = random_date(rng, start, end - timedelta(days=5), n_adm).astype("datetime64[D]")
+    admit = admit[np.lexsort((admit, member_idx))]
+
+    # the per-member chronic/age multiplier scales every condition equally, so it cancels on normalising
+    cond_idx = rng.choice(len(CONDITIONS), size=n_adm, p=COND_WEIGHTS/COND_WEIGHTS.sum())
+    icd10 = ICD_TABLE[cond_idx, rng.integers(0, ICD_COUNT[cond_idx])]
+    los = np.clip(rng.normal(4.2, 2.0, size=n_adm), 1, 18).astype(np.int16)
+    discharge = admit + los.astype("timedelta64[D]")
+    hospital_id = rng.choice(HOSPITALS, size=n_adm)
+    attending_provider_id = rng.choice(PROVIDERS, size=n_adm)
+
+    m_sdi = sdi[member_idx]
+    m_chronic = chronic[member_idx]
+    preventable = rng.random(n_adm) < np.clip(PREVENTABLE_BASE[cond_idx] + 0.25*m_sdi + 0.06*m_chronic, 0, 0.95)
+
+    base_cost = rng.lognormal(mean=8.7, sigma=0.35, size=n_adm)
+    paid = np.clip(base_cost * COND_COST_MULT[cond_idx] * (1 + 0.10*(los-4)), 1800, 90000)
+
+    followup_7d = rng.random(n_adm) < np.clip(0.62 - 0.20*m_sdi - 0.06*m_chronic, 0.05, 0.90)
+
+    admissions = pd.DataFrame({
+        "admission_id": format_ids("A", 1, n_adm, 9),
+        "member_id": members["member_id"].to_numpy()[member_idx],
+        "hospital_id": hospital_id,
+        "attending_provider_id": attending_provider_id,
+        "admit_date": np.datetime_as_string(admit, unit="D"),
+        "discharge_date": np.datetime_as_string(discharge, unit="D"),
+        "length_of_stay": los,
+        "primary_condition_group": pd.Categorical.from_codes(cond_idx, COND_NAMES),
+        "primary_icd10": icd10,
+        "drg": COND_DRG[cond_idx],
+        "preventable_proxy": preventable.astype(np.int8),
+        "followup_within_7d": followup_7d.astype(np.int8),
+        "inpatient_paid_amount": np.round(paid, 2),
+    })
 
     # simulate readmissions
-    m_map = members.set_index("member_id")[["age","sdi","chronic_count"]]
-    ad2 = admissions.merge(m_map, left_on="member_id", right_index=True, how="left")
     x = (
         -2.2
-        + 0.018*(ad2["age"]-50)
-        + 1.2*ad2["sdi"]
-        + 0.28*ad2["chronic_count"]
-        + 0.55*ad2["preventable_proxy"]
-        + 0.70*(1-ad2["followup_within_7d"])
-        + 0.35*ad2["primary_condition_group"].isin(["CHF","COPD","PNEUMONIA"]).astype(int)
+        + 0.018*(age[member_idx]-50)
+        + 1.2*m_sdi
+        + 0.28*m_chronic
+        + 0.55*preventable
+        + 0.70*(~followup_7d)
+        + 0.35*np.isin(COND_NAMES[cond_idx], ["CHF","COPD","PNEUMONIA"])
     )
-    p = sigmoid(x.to_numpy())
-    will_readmit = rng.random(len(ad2)) < np.clip(p, 0.01, 0.55)
-    discharge_dt = pd.to_datetime(ad2["discharge_date"])
-    eligible = discharge_dt <= (pd.Timestamp(end) - pd.Timedelta(days=2))
-    will_readmit = will_readmit & eligible.to_numpy()
-
-    readmit_rows = []
-    for idx, flag in enumerate(will_readmit):
-        if not flag:
-            continue
-        row = admissions.iloc[idx]
-        dis = pd.Timestamp(row["discharge_date"])
-        gap = int(np.clip(rng.normal(12, 7), 2, 30))
-        readmit_date = dis + pd.Timedelta(days=gap)
-        los2 = int(np.clip(rng.normal(3.8, 1.8), 1, 15))
-        discharge2 = readmit_date + pd.Timedelta(days=los2)
-
-        if rng.random() < 0.72:
-            cond = row["primary_condition_group"]
-            icd_list = [c[1] for c in CONDITIONS if c[0]==cond][0]
-            drg = [c[2] for c in CONDITIONS if c[0]==cond][0]
-        else:
-            cond, icd_list, drg = CONDITIONS[rng.integers(0,len(CONDITIONS))]
-        icd10 = rng.choice(icd_list)
-        preventable = int(rng.random() < 0.65)
-        followup_7d = 0
-
-        base_cost = rng.lognormal(mean=8.65, sigma=0.35)
-        cond_mult = {"CHF":1.05,"COPD":1.00,"DIABETES":0.85,"PNEUMONIA":0.95,"SEPSIS":1.60,"CKD":1.20,"HTN":0.80}[cond]
-        paid = float(np.clip(base_cost*cond_mult*(1+0.10*(los2-4)), 1700, 95000))
-
-        readmit_rows.append({
-            "admission_id": f"A{len(admissions)+len(readmit_rows)+1:09d}",
-            "member_id": row["member_id"],
-            "hospital_id": row["hospital_id"],
-            "attending_provider_id": row["attending_provider_id"],
-            "admit_date": readmit_date.date().isoformat(),
-            "discharge_date": discharge2.date().isoformat(),
+    p = sigmoid(x)
+    will_readmit = rng.random(n_adm) < np.clip(p, 0.01, 0.55)
+    eligible = discharge <= np.datetime64(end.date(), "D") - np.timedelta64(2, "D")
+    src_idx = np.flatnonzero(will_readmit & eligible)
+
+    k = len(src_idx)
+    if k:
+        gap = np.clip(rng.normal(12, 7, size=k), 2, 30).astype(int)
+        readmit = discharge[src_idx] + gap.astype("timedelta64[D]")
+        los2 = np.clip(rng.normal(3.8, 1.8, size=k), 1, 15).astype(np.int16)
+        discharge2 = readmit + los2.astype("timedelta64[D]")
+
+        same = rng.random(k) < 0.72
+        cond2 = np.where(same, cond_idx[src_idx], rng.integers(0, len(CONDITIONS), size=k))
+        icd2 = ICD_TABLE[cond2, rng.integers(0, ICD_COUNT[cond2])]
+        preventable2 = rng.random(k) < 0.65
+
+        base_cost = rng.lognormal(mean=8.65, sigma=0.35, size=k)
+        paid2 = np.clip(base_cost * READMIT_COST_MULT[cond2] * (1 + 0.10*(los2-4)), 1700, 95000)
+
+        src = admissions.iloc[src_idx]
+        readmissions = pd.DataFrame({
+            "admission_id": format_ids("A", 1+n_adm, k, 9),
+            "member_id": src["member_id"].to_numpy(),
+            "hospital_id": src["hospital_id"].to_numpy(),
+            "attending_provider_id": src["attending_provider_id"].to_numpy(),
+            "admit_date": np.datetime_as_string(readmit, unit="D"),
+            "discharge_date": np.datetime_as_string(discharge2, unit="D"),
             "length_of_stay": los2,
-            "primary_condition_group": cond,
-            "primary_icd10": icd10,
-            "drg": drg,
-            "preventable_proxy": preventable,
-            "followup_within_7d": followup_7d,
-            "inpatient_paid_amount": round(paid,2),
+            "primary_condition_group": pd.Categorical.from_codes(cond2, COND_NAMES),
+            "primary_icd10": icd2,
+            "drg": COND_DRG[cond2],
+            "preventable_proxy": preventable2.astype(np.int8),
+            "followup_within_7d": np.zeros(k, dtype=np.int8),
+            "inpatient_paid_amount": np.round(paid2, 2),
         })
+        admissions = pd.concat([admissions, readmissions], ignore_index=True)
 
-    if readmit_rows:
-        admissions = pd.concat([admissions, pd.DataFrame(readmit_rows)], ignore_index=True)
-
-    admissions["admit_date"] = pd.to_datetime(admissions["admit_date"])
-    admissions["discharge_date"] = pd.to_datetime(admissions["discharge_date"])
+    # ISO date strings sort chronologically, so no datetime round-trip is needed
     admissions = admissions.sort_values(["member_id","admit_date"]).reset_index(drop=True)
-    admissions["admit_date"] = admissions["admit_date"].dt.date.astype(str)
-    admissions["discharge_date"] = admissions["discharge_date"].dt.date.astype(str)
     return admissions
 
 def make_claims(rng: np.random.Generator, members: pd.DataFrame, admissions: pd.DataFrame, start: datetime, end: datetime) -> pd.DataFrame:
-    rows = []
-    clm_id = 1
-    for _, m in members.iterrows():
-        lam = 8 + 0.20*m["age"] + 2.0*m["chronic_count"] + 6.5*m["sdi"]
-        n_claims = int(np.clip(rng.poisson(lam/10), 2, 40))
-        dates = random_date(rng, start, end, n_claims)
-        for d in dates:
-            cpt = rng.choice(CPT_OUTPATIENT)
-            provider_id = rng.choice(PROVIDERS)
-            paid = float(np.clip(rng.lognormal(4.2, 0.55), 10, 1200))
-            cond, icds, _ = CONDITIONS[rng.integers(0, len(CONDITIONS))]
-            icd10 = rng.choice(icds)
-            rows.append({
-                "claim_id": f"C{clm_id:011d}",
-                "member_id": m["member_id"],
-                "claim_date": pd.Timestamp(d).date().isoformat(),
-                "claim_type": "OUTPATIENT",
-                "provider_id": provider_id,
-                "cpt": cpt,
-                "icd10": icd10,
-                "paid_amount": round(paid,2),
-            })
-            clm_id += 1
+    lam = 8 + 0.20*members["age"].to_numpy() + 2.0*members["chronic_count"].to_numpy() + 6.5*members["sdi"].to_numpy()
+    n_claims = np.clip(rng.poisson(lam/10), 2, 40)
+    n_out = int(n_claims.sum())
+
+    dates = random_date(rng, start, end, n_out).astype("datetime64[D]")
+    cpt = rng.choice(CPT_OUTPATIENT, size=n_out)
+    provider_id = rng.choice(PROVIDERS, size=n_out)
+    paid = np.clip(rng.lognormal(4.2, 0.55, size=n_out), 10, 1200)
+    cond_idx = rng.integers(0, len(CONDITIONS), size=n_out)
+    icd10 = ICD_TABLE[cond_idx, rng.integers(0, ICD_COUNT[cond_idx])]
+
+    frames = [pd.DataFrame({
+        "claim_id": format_ids("C", 1, n_out, 11),
+        "member_id": np.repeat(members["member_id"].to_numpy(), n_claims),
+        "claim_date": np.datetime_as_string(dates, unit="D"),
+        "claim_type": pd.Categorical.from_codes(np.zeros(n_out, dtype=np.int8), CLAIM_TYPES),
+        "provider_id": provider_id,
+        "cpt": cpt,
+        "icd10": icd10,
+        "paid_amount": np.round(paid, 2),
+    })]
 
     if not admissions.empty:
-        for _, a in admissions.iterrows():
-            rows.append({
-                "claim_id": f"C{clm_id:011d}",
-                "member_id": a["member_id"],
-                "claim_date": a["admit_date"],
-                "claim_type": "INPATIENT",
-                "provider_id": a["hospital_id"],
-                "cpt": None,
-                "icd10": a["primary_icd10"],
-                "paid_amount": float(a["inpatient_paid_amount"]),
-            })
-            clm_id += 1
-
-    claims = pd.DataFrame(rows)
-    claims["claim_date"] = pd.to_datetime(claims["claim_date"]).dt.date.astype(str)
-    return claims
+        n_inp = len(admissions)
+        frames.append(pd.DataFrame({
+            "claim_id": format_ids("C", 1+n_out, n_inp, 11),
+            "member_id": admissions["member_id"].to_numpy(),
+            "claim_date": admissions["admit_date"].to_numpy(),
+            "claim_type": pd.Categorical.from_codes(np.ones(n_inp, dtype=np.int8), CLAIM_TYPES),
+            "provider_id": admissions["hospital_id"].to_numpy(),
+            "cpt": None,
+            "icd10": admissions["primary_icd10"].to_numpy(),
+            "paid_amount": admissions["inpatient_paid_amount"].to_numpy(dtype=float),
+        }))
+
+    return pd.concat(frames, ignore_index=True)
+
+def make_member_shard(rng: np.random.Generator, members: pd.DataFrame, start: datetime, end: datetime) -> tuple[pd.DataFrame, pd.DataFrame]:
+    admissions = make_admissions(rng, members, start, end)
+    claims = make_claims(rng, members, admissions, start, end)
+    return admissions, claims
+
+def make_admissions_and_claims(rng: np.random.Generator, members: pd.DataFrame, start: datetime, end: datetime, n_jobs: int = 1) -> tuple[pd.DataFrame, pd.DataFrame]:
+    n_shards = -(-len(members) // MEMBERS_PER_SHARD)
+    if n_shards <= 1:
+        return make_member_shard(rng, members, start, end)
+
+    # members are independent, so each shard gets its own child stream; n_jobs only decides how many run at once
+    bounds = np.linspace(0, len(members), n_shards+1).astype(int)
+    tasks = [
+        (child, members.iloc[lo:hi].reset_index(drop=True))
+        for child, lo, hi in zip(rng.spawn(n_shards), bounds[:-1], bounds[1:])
+    ]
+    if n_jobs == 1:
+        shards = [make_member_shard(child, shard, start, end) for child, shard in tasks]
+    else:
+        from joblib import Parallel, delayed
+        shards = Parallel(n_jobs=n_jobs)(delayed(make_member_shard)(child, shard, start, end) for child, shard in tasks)
+
+    adm_frames = [a for a, _ in shards if not a.empty]
+    admissions = pd.concat(adm_frames, ignore_index=True) if adm_frames else pd.DataFrame()
+    claims = pd.concat([c for _, c in shards], ignore_index=True)
+
+    # ids restart at 1 in every shard; renumber so they are unique across the run
+    if not admissions.empty:
+        admissions["admission_id"] = format_ids("A", 1, len(admissions), 9)
+    claims["claim_id"] = format_ids("C", 1, len(claims), 11)
+    return admissions, claims
 
 def main():
     ap = argparse.ArgumentParser()
@@ -230,6 +250,7 @@ def main():
     ap.add_argument("--end_date", type=str, default="2025-12-31")
     ap.add_argument("--seed", type=int, default=42)
     ap.add_argument("--output_dir", type=str, default="data/raw")
+    ap.add_argument("--n_jobs", type=int, default=1, help="member shards generated in parallel with joblib (-1 = all cores); output does not depend on it")
     args = ap.parse_args()
 
     rng = np.random.default_rng(args.seed)
@@ -237,8 +258,7 @@ def main():
     end = datetime.fromisoformat(args.end_date)
 
     members = make_members(rng, args.n_members)
-    admissions = make_admissions(rng, members, start, end)
-    claims = make_claims(rng, members, admissions, start, end)
+    admissions, claims = make_admissions_and_claims(rng, members, start, end, n_jobs=args.n_jobs)
 
     import os
     os.makedirs(args.output_dir, exist_ok=True)
@@ -8,16 +8,24 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+def read_table(processed_dir: str, name: str) -> pd.DataFrame:
+    path = os.path.join(processed_dir, f"{name}.parquet")
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    return pd.read_csv(os.path.join(processed_dir, f"{name}.csv"), engine="pyarrow")
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--processed_dir", type=str, default="data/processed")
     ap.add_argument("--out_html", type=str, default="dashboard/readmissions_dashboard.html")
+    ap.add_argument("--include_plotlyjs", type=str, choices=["cdn","directory"], default="cdn",
+                    help="directory: share one plotly.min.js written next to the HTML (offline, outside the repo)")
     args = ap.parse_args()
 
-    kpi = pd.read_csv(os.path.join(args.processed_dir, "kpi_summary.csv")).iloc[0].to_dict()
-    dx = pd.read_csv(os.path.join(args.processed_dir, "diagnosis_summary.csv"))
-    risk = pd.read_csv(os.path.join(args.processed_dir, "patient_risk_scores.csv"))
-    roi = pd.read_csv(os.path.join(args.processed_dir, "intervention_roi.csv"))
+    kpi = read_table(args.processed_dir, "kpi_summary").iloc[0].to_dict()
+    dx = read_table(args.processed_dir, "diagnosis_summary")
+    risk = read_table(args.processed_dir, "patient_risk_scores")
+    roi = read_table(args.processed_dir, "intervention_roi")
 
     top_dx = dx.sort_values("preventable_readmission_events", ascending=False).head(8)
     tier = risk["risk_tier"].value_counts().reindex(["High","Medium","Low"]).fillna(0)
@@ -74,18 +82,21 @@ def main():
     table["expected_readmission_reduction_pct"] = (table["expected_readmission_reduction_pct"]*100).round(1).astype(str) + "%"
     fig.add_trace(go.Table(
         header={"values": list(table.columns)},
-        cells={"values": [table[c].tolist() for c in table.columns]}
+        cells={"values": table.to_numpy().T.tolist()}
     ), row=3, col=2)
 
     fig.update_layout(
         title="Value-Based Care Analytics — Preventable Readmissions & Cost Leakage (Synthetic Data)",
         height=1050,
         margin=dict(l=30,r=30,t=80,b=30),
-        showlegend=False
+        showlegend=False,
+        uirevision="static"
     )
 
     os.makedirs(os.path.dirname(args.out_html), exist_ok=True)
-    fig.write_html(args.out_html, include_plotlyjs="cdn")
+    # the committed dashboard loads plotly.js from the CDN so it works in any clone (plotly.min.js is not
+    # committed); the figure was built from validated graph objects, so skip re-validating it on write
+    fig.write_html(args.out_html, include_plotlyjs=args.include_plotlyjs, validate=False, config={"responsive": True})
     print("Wrote:", args.out_html)
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+import functools
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import build_analytics_tables as bat
+import generate_synthetic_claims as gen
+
+
+def test_util_features_on_claims_spanning_several_parser_blocks(tmp_path):
+    # ~70k claims (~4 MB) is well past one C-parser block, and the trailing inpatient
+    # claims fill whole blocks with NaN cpt
+    rng = np.random.default_rng(0)
+    start, end = datetime(2024, 1, 1), datetime(2025, 12, 31)
+    members = gen.make_members(rng, 20000)
+    admissions = gen.make_admissions(rng, members, start, end)
+    claims = gen.make_claims(rng, members, admissions, start, end)
+    claims_path = tmp_path / "claims.csv"
+    claims.to_csv(claims_path, index=False)
+
+    admissions_enriched, _ = bat.compute_readmission_flags(admissions)
+    as_of = admissions_enriched["admit_date"].max()
+    feats = bat.build_util_features(members, admissions_enriched, str(claims_path), as_of)
+
+    claim_date = pd.to_datetime(claims["claim_date"])
+    window = claims[(claim_date >= as_of - pd.Timedelta(days=365)) & (claim_date <= as_of)]
+    expected_ed = window[window["cpt"].isin(bat.ED_CPT_CODES)].groupby("member_id").size()
+    expected_outpatient = window[window["claim_type"] == "OUTPATIENT"].groupby("member_id").size()
+
+    got = feats.set_index("member_id")
+    assert got["ed_visits_12m"].sum() == expected_ed.sum()
+    assert got["outpatient_visits_12m"].sum() == expected_outpatient.sum()
+    assert (got.loc[expected_ed.index, "ed_visits_12m"] == expected_ed).all()
+
+
+def write_raw(raw_dir, n_members, seed=0, shuffle_admissions=False):
+    rng = np.random.default_rng(seed)
+    start, end = datetime(2024, 1, 1), datetime(2025, 12, 31)
+    members = gen.make_members(rng, n_members)
+    admissions = gen.make_admissions(rng, members, start, end)
+    claims = gen.make_claims(rng, members, admissions, start, end)
+    if shuffle_admissions:
+        admissions = admissions.sample(frac=1, random_state=seed)
+    raw_dir.mkdir()
+    members.to_csv(raw_dir / "members.csv", index=False)
+    admissions.to_csv(raw_dir / "admissions.csv", index=False)
+    claims.to_csv(raw_dir / "claims.csv", index=False)
+
+
+def run_build(monkeypatch, raw_dir, out_dir, *args):
+    monkeypatch.setattr(sys, "argv", ["build_analytics_tables.py", "--raw_dir", str(raw_dir), "--out_dir", str(out_dir), *args])
+    bat.main()
+
+
+def test_engines_share_an_out_dir(tmp_path, monkeypatch):
+    pytest.importorskip("dask.dataframe")
+    raw, out = tmp_path / "raw", tmp_path / "processed"
+    write_raw(raw, 300)
+
+    # dask writes the event tables as parquet directories and pandas as single files
+    for engine in ["dask", "pandas", "dask"]:
+        run_build(monkeypatch, raw, out, "--engine", engine)
+        admissions = pd.read_parquet(out / "admissions_enriched.parquet")
+        events = pd.read_parquet(out / "readmissions_events.parquet")
+        kpi = pd.read_parquet(out / "kpi_summary.parquet").iloc[0]
+        assert len(admissions) == kpi["total_admissions"]
+        assert events["index_admission_id"].is_unique
+
+
+def test_risk_scores_match_with_numba_kernel(monkeypatch):
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(0)
+    members = gen.make_members(rng, 500)
+    feats = pd.DataFrame({
+        "member_id": members["member_id"],
+        "prior_admissions_12m": rng.integers(0, 12, 500),
+        "ed_visits_12m": rng.integers(0, 25, 500),
+        "outpatient_visits_12m": rng.integers(0, 70, 500),
+        "no_followup_rate": rng.random(500),
+    })
+
+    expected = bat.score_risk(members, feats)
+    monkeypatch.setattr(bat, "RISK_JIT_MIN_ROWS", 0)
+    pd.testing.assert_frame_equal(bat.score_risk(members, feats), expected)
+
+
+def pandas_engine(raw_dir):
+    admissions = pd.read_csv(raw_dir / "admissions.csv", engine="pyarrow", dtype=bat.ADMISSION_DTYPES)
+    admissions_enriched, readm_events = bat.compute_readmission_flags(admissions)
+    return (admissions_enriched, readm_events, *bat.build_summaries(admissions_enriched, readm_events))
+
+
+def assert_rows_match(got, expected):
+    # date resolution and the float days_to_next_admit (NaN-padded in pandas) differ by engine
+    def normalise(df):
+        dates = df.select_dtypes("datetime").columns
+        return df.astype({c: "datetime64[s]" for c in dates}).reset_index(drop=True)
+    pd.testing.assert_frame_equal(normalise(got), normalise(expected), check_dtype=False, check_categorical=False)
+
+
+def test_polars_engine_matches_pandas(tmp_path):
+    pytest.importorskip("polars")
+    raw = tmp_path / "raw"
+    write_raw(raw, 2000)
+
+    adm, events, dx, hosp = pandas_engine(raw)
+    pl_adm, pl_events, pl_dx, pl_hosp = bat.build_summaries_polars(str(raw / "admissions.csv"))
+
+    assert_rows_match(pl_adm, adm)
+    assert_rows_match(pl_events, events)
+    # summaries are written as tables, so their schema must not depend on the engine
+    pd.testing.assert_frame_equal(pl_dx.reset_index(drop=True), dx.reset_index(drop=True), check_categorical=False)
+    pd.testing.assert_frame_equal(pl_hosp.reset_index(drop=True), hosp.reset_index(drop=True))
+
+
+def read_parquet_schema(path):
+    # compare the Arrow schema; the pandas metadata records dask's NA-backed strings differently
+    return pq.read_table(path).to_pandas(ignore_metadata=True)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_dask_engine_matches_pandas(tmp_path, monkeypatch, fmt):
+    pytest.importorskip("dask.dataframe")
+    raw = tmp_path / "raw"
+    # unsorted admissions in several partitions: a member's admissions only meet after the shuffle
+    write_raw(raw, 2000, shuffle_admissions=True)
+    flags_dask = functools.partial(bat.compute_readmission_flags_dask, blocksize="50KB")
+    assert flags_dask(str(raw / "admissions.csv"))[0].npartitions > 1
+    monkeypatch.setattr(bat, "compute_readmission_flags_dask", flags_dask)
+
+    outputs = {}
+    for engine in ["pandas", "dask"]:
+        run_build(monkeypatch, raw, tmp_path / engine, "--engine", engine, "--format", fmt)
+        read = read_parquet_schema if fmt == "parquet" else pd.read_csv
+        outputs[engine] = {
+            name: read(tmp_path / engine / f"{name}.{fmt}")
+            for name in ["diagnosis_summary", "hospital_summary", "kpi_summary", "readmissions_events", "admissions_enriched"]
+        }
+
+    expected, got = outputs["pandas"], outputs["dask"]
+    for name in ["diagnosis_summary", "hospital_summary", "kpi_summary"]:
+        pd.testing.assert_frame_equal(got[name], expected[name])
+    # dask rows come out in shuffle order
+    assert_rows_match(got["readmissions_events"].sort_values("index_admission_id"), expected["readmissions_events"].sort_values("index_admission_id"))
+    assert_rows_match(got["admissions_enriched"].sort_values("admission_id"), expected["admissions_enriched"].sort_values("admission_id"))
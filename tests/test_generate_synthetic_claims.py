@@ -0,0 +1,30 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import generate_synthetic_claims as gen
+
+
+def test_sharded_output_does_not_depend_on_n_jobs(monkeypatch):
+    # 7 members in shards of 2 -> four shards, more than the two workers
+    monkeypatch.setattr(gen, "MEMBERS_PER_SHARD", 2)
+    start, end = datetime(2024, 1, 1), datetime(2025, 12, 31)
+
+    runs = []
+    for n_jobs in [1, 2, -1]:
+        rng = np.random.default_rng(0)
+        members = gen.make_members(rng, 7)
+        runs.append(gen.make_admissions_and_claims(rng, members, start, end, n_jobs=n_jobs))
+
+    for admissions, claims in runs[1:]:
+        pd.testing.assert_frame_equal(admissions, runs[0][0])
+        pd.testing.assert_frame_equal(claims, runs[0][1])
+    admissions, claims = runs[0]
+    assert set(claims["member_id"]) == set(members["member_id"])
+    assert claims["claim_id"].is_unique
+    assert admissions["admission_id"].is_unique